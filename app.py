@@ -1,6 +1,10 @@
 import streamlit as st
-import json
+import atexit
+import collections
+import mmap
+import orjson
 import os
+import threading
 
 # Page configuration
 st.set_page_config(layout="wide", page_title="Conversation Labeling App")
@@ -10,49 +14,181 @@ label_options = [
     "visualisation",
     "integrations",
 ]
+_LABEL_KEYS = tuple(f"label_{label}" for label in label_options)
 
 
 # Function to read JSONL files
 def read_jsonl(file_path):
     data = []
-    if os.path.exists(file_path):
-        with open(file_path, "r") as f:
-            for line in f:
-                try:
-                    item = json.loads(line.strip())
-                    data.append(item)
-                except json.JSONDecodeError:
-                    # Skip lines that aren't valid JSON
-                    continue
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        return data
+    # Scan the mapped file for newlines rather than going through readline
+    with open(file_path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        start = 0
+        end = len(mm)
+        while start < end:
+            stop = mm.find(b"\n", start)
+            if stop < 0:
+                stop = end
+            try:
+                item = orjson.loads(mm[start:stop])
+                data.append(item)
+            except orjson.JSONDecodeError:
+                # Skip lines that aren't valid JSON
+                pass
+            start = stop + 1
     return data
 
 
+def _file_sig(file_path):
+    # Cache key that changes whenever the file is rewritten or appended to
+    if not os.path.exists(file_path):
+        return (file_path, None, None)
+    return (file_path, os.path.getmtime(file_path), os.path.getsize(file_path))
+
+
+# cache_resource hands back the same list without copying it on every rerun,
+# so callers must treat it as read-only
+@st.cache_resource(max_entries=1)
+def read_jsonl_cached(file_path, sig):
+    # `sig` is only used as part of the cache key
+    return read_jsonl(file_path)
+
+
+# labels.jsonl is append-only, so only parse the bytes added since the last rerun.
+# Only the line count and labeled query ids are kept, not the parsed records.
+# labels_generation is bumped on every reset so state derived from the old ids
+# (the unlabeled queue) knows to rebuild.
+def _reset_labels_state(state, ino=None):
+    state.labels_generation = state.get("labels_generation", -1) + 1
+    state.labels_count = 0
+    state.labels_ids = set()
+    state.labels_offset = 0
+    state.labels_mtime = 0.0
+    state.labels_ino = ino
+
+
+def load_labels_incremental(file_path="./data/labels.jsonl"):
+    state = st.session_state
+    if "labels_offset" not in state:
+        _reset_labels_state(state)
+
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        if state.labels_ino is not None:
+            # File was deleted since it was last read
+            _reset_labels_state(state)
+        return state.labels_count, state.labels_ids
+
+    if (
+        stat.st_ino != state.labels_ino
+        or stat.st_mtime < state.labels_mtime
+        or stat.st_size < state.labels_offset
+    ):
+        # File was truncated or replaced, start over
+        _reset_labels_state(state, stat.st_ino)
+
+    with open(file_path, "rb") as f:
+        f.seek(state.labels_offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                # Partially written line, pick it up on the next rerun
+                break
+            state.labels_offset += len(line)
+            try:
+                item = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            state.labels_count += 1
+            state.labels_ids.add(item.get("query_id"))
+
+    state.labels_mtime = stat.st_mtime
+    return state.labels_count, state.labels_ids
+
+
+# Keep labels.jsonl open for appending instead of reopening it on every save.
+# One descriptor is shared by every session and closed at exit.
+@st.cache_resource
+def _labels_writer():
+    writer = {"fd": None, "lock": threading.Lock()}
+
+    def close():
+        if writer["fd"] is not None:
+            os.close(writer["fd"])
+
+    atexit.register(close)
+    return writer
+
+
+def _fd_is_current(fd, file_path):
+    # The open fd is stale if labels.jsonl was deleted or replaced since
+    try:
+        current = os.stat(file_path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(fd)
+    return (
+        opened.st_nlink > 0
+        and opened.st_ino == current.st_ino
+        and opened.st_dev == current.st_dev
+    )
+
+
+def append_label(labeled_conv, file_path="./data/labels.jsonl"):
+    writer = _labels_writer()
+    with writer["lock"]:
+        fd = writer["fd"]
+        if fd is None or not _fd_is_current(fd, file_path):
+            if fd is not None:
+                os.close(fd)
+            fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            writer["fd"] = fd
+        # One serialized record including its newline, normally a single syscall;
+        # keep writing on a short write so a record is never left truncated
+        data = memoryview(orjson.dumps(labeled_conv, option=orjson.OPT_APPEND_NEWLINE))
+        while data:
+            data = data[os.write(fd, data) :]
+
+
 # Read the data files
-generated_data = read_jsonl("./data/generated.jsonl")
-labeled_data = read_jsonl("./data/labels.jsonl")
+generated_sig = _file_sig("./data/generated.jsonl")
+generated_data = read_jsonl_cached("./data/generated.jsonl", generated_sig)
+labeled_count, labeled_ids = load_labels_incremental()
 
 # Statistics at the top
 st.markdown("## Statistics")
 st.markdown(f"**Total conversations**: {len(generated_data)}")
-st.markdown(f"**Labeled conversations**: {len(labeled_data)}")
-st.markdown(f"**Remaining**: {len(generated_data) - len(labeled_data)}")
+st.markdown(f"**Labeled conversations**: {labeled_count}")
+st.markdown(f"**Remaining**: {len(generated_data) - labeled_count}")
 
 # Progress bar
-progress = len(labeled_data) / len(generated_data) if generated_data else 0
+progress = labeled_count / len(generated_data) if generated_data else 0
 st.progress(progress)
 
 # Main content with conversation labeler
 st.markdown("## Conversation Labeler")
 
-# Get unlabeled conversations (those in generated but not in labeled)
-labeled_ids = {item.get("query_id") for item in labeled_data}
-unlabeled_conversations = [
-    item for item in generated_data if item.get("query_id") not in labeled_ids
-]
-
-if unlabeled_conversations:
+# Queue of unlabeled conversations (those in generated but not in labeled),
+# rebuilt only when generated.jsonl changes or the label state was reset, and
+# consumed as conversations are saved or skipped
+queue_sig = (generated_sig, st.session_state.labels_generation)
+if st.session_state.get("queue_sig") != queue_sig:
+    st.session_state.queue = collections.deque(
+        item for item in generated_data if item.get("query_id") not in labeled_ids
+    )
+    st.session_state.queue_sig = queue_sig
+queue = st.session_state.queue
+
+# Drop conversations labeled since the queue was built, e.g. from another tab
+while queue and queue[0].get("query_id") in labeled_ids:
+    queue.popleft()
+
+if queue:
     # Display the first unlabeled conversation
-    current_conv = unlabeled_conversations[0]
+    current_conv = queue[0]
 
     # Create two columns for the main interface
     col1, col2 = st.columns([2, 1])
@@ -75,15 +211,13 @@ if unlabeled_conversations:
         # Define common label options (you can customize this list)
 
         # Get predefined labels for this item if they exist
-        predefined_labels = current_conv.get("labels", [])
+        predefined_set = set(current_conv.get("labels", ()))
 
         # Create vertically aligned checkboxes for each label
         selected_labels = []
-        for label in label_options:
+        for label, key in zip(label_options, _LABEL_KEYS):
             # Pre-check the box if this label is predefined
-            if st.checkbox(
-                label, key=f"label_{label}", value=label in predefined_labels
-            ):
+            if st.checkbox(label, key=key, value=label in predefined_set):
                 selected_labels.append(label)
 
         # Add spacing before save button
@@ -98,8 +232,8 @@ if unlabeled_conversations:
                 labeled_conv["labels"] = selected_labels
 
                 # Append to labels.jsonl
-                with open("./data/labels.jsonl", "a") as f:
-                    f.write(json.dumps(labeled_conv) + "\n")
+                append_label(labeled_conv)
+                queue.popleft()
 
                 st.success("Labels saved successfully!")
                 st.rerun()
@@ -112,8 +246,8 @@ if unlabeled_conversations:
             labeled_conv = current_conv.copy()
             # Keep the predefined labels instead of clearing them
 
-            with open("./data/labels.jsonl", "a") as f:
-                f.write(json.dumps(labeled_conv) + "\n")
+            append_label(labeled_conv)
+            queue.popleft()
 
             st.info("Skipped this conversation.")
             st.rerun()
@@ -1,19 +1,36 @@
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 import typer
 from rich import print
 from rich.progress import track
 
-# Add nbformat as an optional import since it may not be installed yet
+# Notebooks are streamed with ijson (a project dependency). nbformat is optional
+# and only needed to upgrade pre-v4 notebooks or when ijson is unavailable.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 try:
     import nbformat
 except ImportError:
+    nbformat = None
+
+if ijson is None and nbformat is None:
     print(
-        "[yellow]Warning: nbformat not installed. Please install with 'pip install nbformat'[/yellow]"
+        "[yellow]Warning: neither ijson nor nbformat is installed. Please install with 'pip install ijson'[/yellow]"
     )
     exit(1)
 
+_CODE_OPEN = "```python\n"
+_FENCE_OPEN = "```\n"
+_FENCE_CLOSE = "\n```\n\n"
+_OUTPUT_OPEN = "<output>\n\n"
+_OUTPUT_CLOSE = "</output>\n\n"
+
 
 def convert_notebook_to_md(notebook_path: str, output_path: str) -> None:
     """
@@ -23,41 +40,87 @@ def convert_notebook_to_md(notebook_path: str, output_path: str) -> None:
         notebook_path: Path to the input notebook file
         output_path: Path where markdown file should be saved
     """
-    # Read the notebook
-    with open(notebook_path) as f:
-        nb = nbformat.read(f, as_version=4)
-
-    md_content = []
+    buf = io.StringIO()
+    w = buf.write
 
-    # Convert each cell
-    for cell in nb.cells:
-        if cell.cell_type == "markdown":
-            md_content.append(cell.source + "\n")
+    # Every fragment is followed by a blank line; the final one is trimmed below
+    for cell in _iter_cells(notebook_path):
+        cell_type = cell["cell_type"]
+        if cell_type == "markdown":
+            w(_text(cell["source"]))
+            w("\n\n")
 
-        elif cell.cell_type == "code":
+        elif cell_type == "code":
             # Add code block
-            md_content.append(f"```python\n{cell.source}\n```\n")
+            w(_CODE_OPEN)
+            w(_text(cell["source"]))
+            w(_FENCE_CLOSE)
             # Add outputs if present
-            if cell.outputs:
-                md_content.append("<output>\n")
-                for output in cell.outputs:
+            outputs = cell.get("outputs")
+            if outputs:
+                w(_OUTPUT_OPEN)
+                for output in outputs:
                     if "text" in output:
-                        md_content.append("```\n" + output.text + "\n```\n")
+                        w(_FENCE_OPEN)
+                        w(_text(output["text"]))
+                        w(_FENCE_CLOSE)
                     elif "data" in output:
-                        if "text/plain" in output.data:
-                            md_content.append(
-                                "```\n" + str(output.data["text/plain"]) + "\n```\n"
-                            )
-                md_content.append("</output>\n")
+                        if "text/plain" in output["data"]:
+                            w(_FENCE_OPEN)
+                            w(_text(output["data"]["text/plain"]))
+                            w(_FENCE_CLOSE)
+                w(_OUTPUT_CLOSE)
+
+    # Drop the trailing separator in place rather than slicing a second copy
+    if buf.tell():
+        buf.truncate(buf.tell() - 1)
 
     # Write markdown file
     with open(output_path, "w") as f:
-        f.write("\n".join(md_content))
+        f.write(buf.getvalue())
+
+
+def _iter_cells(notebook_path: str) -> Iterator[dict]:
+    """
+    Yield the cells of a notebook one at a time.
+
+    Uses ijson to stream cells without building or validating the whole
+    notebook. nbformat is used instead when ijson is not installed, and for
+    pre-v4 notebooks (cells under worksheets[].cells), which it upgrades.
+    """
+    if ijson is not None:
+        found = False
+        with open(notebook_path, "rb") as f:
+            for cell in ijson.items(f, "cells.item"):
+                found = True
+                yield cell
+        if found:
+            return
+        # No top-level cells: either an empty v4 notebook or an older format
+        with open(notebook_path, "rb") as f:
+            version = next(ijson.items(f, "nbformat"), None)
+        if version is not None and version >= 4:
+            return
+        if nbformat is None:
+            raise ValueError(
+                f"{notebook_path} uses nbformat {version}; install nbformat to upgrade it"
+            )
+
+    with open(notebook_path) as f:
+        yield from nbformat.read(f, as_version=4).cells
+
+
+def _text(value) -> str:
+    # Raw notebook JSON stores multiline strings as lists of lines
+    if isinstance(value, list):
+        return "".join(value)
+    return str(value)
 
 
 def find_notebooks(root_dir: str) -> List[Path]:
     """
-    Find all Jupyter notebooks in a directory and its subdirectories.
+    Find all Jupyter notebooks in a directory and its subdirectories,
+    skipping hidden directories (including .ipynb_checkpoints) and __pycache__.
 
     Args:
         root_dir: Root directory to search for notebooks
@@ -66,9 +129,17 @@ def find_notebooks(root_dir: str) -> List[Path]:
         List of paths to notebook files
     """
     notebooks = []
-    for path in Path(root_dir).rglob("*.ipynb"):
-        if not ".ipynb_checkpoints" in str(path):
-            notebooks.append(path)
+    stack = [root_dir]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    # Skip .ipynb_checkpoints, .git, .venv etc. without descending
+                    if entry.name.startswith(".") or entry.name == "__pycache__":
+                        continue
+                    stack.append(entry.path)
+                elif entry.name.endswith(".ipynb"):
+                    notebooks.append(Path(entry.path))
     return notebooks
 
 
@@ -104,11 +175,22 @@ def convert(
             print(f"Would convert {nb_path} to {md_path}")
         return
 
-    # Convert each notebook with progress bar
-    for nb_path in track(notebooks, description="Converting notebooks..."):
-        md_path = nb_path.with_suffix(".md")
-        print(f"Converting {nb_path} to {md_path}")
-        convert_notebook_to_md(str(nb_path), str(md_path))
+    # Convert notebooks in parallel, advancing the progress bar as each finishes
+    with ProcessPoolExecutor() as executor:
+        futures = {
+            executor.submit(
+                convert_notebook_to_md, str(nb_path), str(nb_path.with_suffix(".md"))
+            ): nb_path
+            for nb_path in notebooks
+        }
+        for future in track(
+            as_completed(futures),
+            total=len(futures),
+            description="Converting notebooks...",
+        ):
+            nb_path = futures[future]
+            future.result()
+            print(f"Converted {nb_path} to {nb_path.with_suffix('.md')}")
 
     print("[green]Conversion complete![/green]")
 
@@ -1,19 +1,25 @@
 from kura.types import Message, Conversation
 from datetime import datetime
+from typing import Optional
 
+_CONTENT_TEMPLATE = """
+User Query: %s
+Retrieved Information : %s
+"""
 
-def process_query_obj(obj: dict):
+
+def process_query_obj(obj: dict, *, now: Optional[datetime] = None):
+    # Batch callers can pass a shared `now` to avoid a clock lookup per item
+    if now is None:
+        now = datetime.now()
     return Conversation(
         chat_id=obj["query_id"],
-        created_at=datetime.now(),
+        created_at=now,
         messages=[
             Message(
-                created_at=datetime.now(),
+                created_at=now,
                 role="user",
-                content=f"""
-User Query: {obj["query"]}
-Retrieved Information : {obj["matching_document"]}
-""",
+                content=_CONTENT_TEMPLATE % (obj["query"], obj["matching_document"]),
             )
         ],
         metadata={"query_weight": obj["query_weight"], "query_id": obj["query_id"]},